@@ -3,17 +3,93 @@ import os
 from github_projects.schemas import ProjectID, RepoFilter, Issue, Iteration, PullRequest, PRFilter, RepoPRFilter, PRAnalyticsRequest
 from fastmcp import FastMCP, Context
 from fastapi import HTTPException, status
-import httpx
+from contextlib import aclosing
 from github_projects import ql
-import re
+from github_projects.client import close_client, gh_graphql, iter_pages, require_pat, search_or_list
+import asyncio
 import sys
-from github_projects.report import PRAnalyzer, HTMLReportGenerator, get_repo_prs_direct
+from github_projects.report import PRAnalyzer, HTMLReportGenerator, get_repo_prs_direct, get_repos_prs_direct, iter_repo_prs_direct
+from github_projects.utils.cache import TTLCache
+from github_projects.utils.datetime_utils import to_github_timestamp, to_search_range
+
 
 mcp: FastMCP = FastMCP("github-projects")
 
 GH_API_URL = "https://api.github.com/graphql"
 PAT = os.environ["GITHUB_PAT"]
 
+# characters that give a title filter regex meaning, anything else is plain text
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+# iteration configs rarely change so cache them per project for a few minutes
+_iteration_cache = TTLCache(maxsize=128, ttl=300)
+# short lived results of `get_repo_prs`, keyed by its request, so repeat
+# calls with the same arguments within a session skip GitHub
+_tool_cache = TTLCache(maxsize=256, ttl=30)
+
+
+def _project_issue_search_query(repo_filter: RepoFilter) -> str | None:
+    """Build a GitHub search query for the project's issues that applies the
+    state and updated filters server side. Returns None when there is nothing
+    for search to filter on.
+    """
+    qualifiers = []
+    if repo_filter.state:
+        state = repo_filter.state.upper()
+        if state not in ("OPEN", "CLOSED"):
+            return None
+        qualifiers.append(f"is:{state.lower()}")
+    updated_range = to_search_range("updated", repo_filter.updated_after, repo_filter.updated_before)
+    if updated_range:
+        qualifiers.append(updated_range)
+    if not qualifiers:
+        return None
+    return " ".join([f"project:{repo_filter.organization}/{repo_filter.project_number}", "is:issue", *qualifiers])
+
+
+def _node_iteration_id(node: dict) -> str | None:
+    """Get the iteration ID of a raw project item node without building an Issue."""
+    for fv in node["fieldValues"]["nodes"]:
+        field = fv.get("field")
+        if field and field.get("name") == "Iteration" and (iteration_id := fv.get("iterationId")):
+            return iteration_id
+    return None
+
+
+def _project_item_field_values(project_items: dict, project: ProjectID) -> dict | None:
+    """Get the field values of the item in `project` from a page of an issue's
+    project items, or None if it isn't on this page.
+    """
+    for item in project_items.get("nodes", []):
+        item_project = item.get("project") or {}
+        owner = (item_project.get("owner") or {}).get("login", "")
+        if (
+            item_project.get("number") == project.project_number
+            and owner.lower() == project.organization.lower()
+        ):
+            return item["fieldValues"]
+    return None
+
+
+async def _search_hit_to_project_item(hit: dict, project: ProjectID) -> dict:
+    """Wrap an issue returned by search in the same shape as a project item,
+    using the field values of the issue's item in `project`. Search only
+    returns an issue's first few project items, the rest are paged through
+    when `project` isn't among them.
+    """
+    project_items = hit.get("projectItems") or {}
+    field_values = _project_item_field_values(project_items, project)
+    while field_values is None and project_items.get("pageInfo", {}).get("hasNextPage"):
+        data = await gh_graphql(
+            GH_API_URL,
+            ql.get_issue_project_items,
+            {"id": hit["id"], "after": project_items["pageInfo"]["endCursor"]},
+            PAT,
+        )
+        project_items = data["node"]["projectItems"]
+        field_values = _project_item_field_values(project_items, project)
+    return {"content": hit, "fieldValues": field_values or {"nodes": []}}
+
 
 @mcp.tool()
 async def generate_pr_analytics_report(
@@ -39,16 +115,21 @@ async def generate_pr_analytics_report(
     """
     
     await ctx.info(f"Generating analytics report: '{request.report_title}'")
-    prs = await get_repo_prs_direct(
+    analyzer = PRAnalyzer()
+    # the report only uses PR stats so skip fetching bodies, labels etc
+    async for page in iter_repo_prs_direct(
         pr_filter=request,
         ctx=ctx,
         PAT=PAT,
-        GH_API_URL=GH_API_URL
-    )
-    await ctx.info(f"Analyzing {len(prs)} pull requests")
+        GH_API_URL=GH_API_URL,
+        include_details=False,
+    ):
+        analyzer.ingest_batch(page)
+    await ctx.info(f"Analyzing {len(analyzer.pull_requests)} pull requests")
     await ctx.info("Analyzing pull request data...")
-    analyzer = PRAnalyzer(prs)
-    analytics_data = analyzer.analyze_time_period(
+    # analysis is CPU bound so keep it off the event loop
+    analytics_data = await asyncio.to_thread(
+        analyzer.analyze_time_period,
         start_date=request.merged_after,
         end_date=request.merged_before
     )
@@ -98,37 +179,13 @@ async def get_project_details(
         "number": project_request.project_number
     }
 
-    if not PAT:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No GitHub Personal Access Token provided, this must be set via `GITHUB_PAT`"
-        )
-    
-    headers = {
-        "Authorization": f"Bearer {PAT}",
-        "Accept": "application/vnd.github+json"
-    }
-    
+    # check before fetching so a missing PAT isn't reported as GitHub failing
+    require_pat(PAT)
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                GH_API_URL,
-                json={"query": ql.get_project_details, "variables": variables},
-                headers=headers,
-                timeout=30
-            )
-            response.raise_for_status()
-            result = response.json()
-        
-        # Check for GraphQL errors
-        if "errors" in result:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"GitHub API error: {result['errors']}"
-            )
-        
-        return result["data"]
-        
+        # project details rarely change so a recent response can be reused,
+        # each call still gets its own decoded copy to return
+        return await gh_graphql(GH_API_URL, ql.get_project_details, variables, PAT, max_age=60)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -149,64 +206,62 @@ async def get_repo_issues(
         "after": None
     }
 
-    if not PAT:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No GitHub Personal Access Token provided, this must be set via `GITHUB_PAT`"
-        )
-
-    headers = {
-        "Authorization": f"Bearer {PAT}",
-        "Accept": "application/vnd.github+json"
-    }
     tasks: list[Issue] = []
 
-    while True:
-        print(f"On page {variables['after']}")
+    # the title filter is compiled once per request, plain text filters skip the regex engine
+    title_re = repo_filter.title_re
+    title_is_literal = title_re is not None and _REGEX_SPECIAL_CHARS.isdisjoint(repo_filter.title)
+    updated_after = to_github_timestamp(repo_filter.updated_after, round_up=True)
+    updated_before = to_github_timestamp(repo_filter.updated_before)
+
+    async def fetch_project_items(after: str | None) -> dict:
+        await ctx.debug(f"On page cursor={after}")
+        data = await gh_graphql(GH_API_URL, ql.get_tasks, {**variables, "after": after}, PAT)
+        return data["organization"]["projectV2"]["items"]
 
-        headers = {
-            "Authorization": f"Bearer {PAT}",
-            "Accept": "application/vnd.github+json"
+    async def search_project_issues(after: str | None) -> dict:
+        await ctx.debug(f"On search page cursor={after}")
+        data = await gh_graphql(GH_API_URL, ql.search_project_issues, {"q": search_query, "after": after}, PAT)
+        search = data["search"]
+        # reshape search hits to look like project items
+        return {
+            "totalCount": search["issueCount"],
+            "nodes": [await _search_hit_to_project_item(hit, repo_filter) for hit in search["nodes"]],
+            "pageInfo": search["pageInfo"],
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                GH_API_URL,
-                json={"query": ql.get_tasks, "variables": variables},
-                headers=headers,
-                timeout=30
-            )
-            response.raise_for_status()
-            result = response.json()
-        
-        # get all graph nodes
-        nodes = result["data"]["organization"]["projectV2"]["items"]["nodes"]
-        for node in nodes:
-            if node.get("content", {}):
-                valid_task = True
-                task = Issue.from_gh_json(node)
-                if repo_filter.title:
-                    if not re.match(repo_filter.title, task.title):
-                        valid_task = False
-                if repo_filter.iteration_id:
-                    if not (
-                        task.iteration  # confirm task has an iteration
-                        and task.iteration.id == repo_filter.iteration_id  # check iteration matches
-                    ):
-                        # if we got here, the task is not valid with this filter
-                        valid_task = False
-                if repo_filter.state and (task.state != repo_filter.state):
-                    valid_task = False
-                if repo_filter.updated_after and (task.updatedAt < repo_filter.updated_after):
-                    valid_task = False
-                if repo_filter.updated_before and (task.updatedAt > repo_filter.updated_before):
-                    valid_task = False
+
+    # let GitHub apply the state and updated filters where it can
+    search_query = _project_issue_search_query(repo_filter)
+    fetch_page, items = await search_or_list(
+        search_project_issues if search_query else None, fetch_project_items
+    )
+    await ctx.info(f"Found {items['totalCount']} project items")
+
+    async with aclosing(iter_pages(fetch_page, items)) as pages:
+        async for items in pages:
+            # check filters against the raw nodes so that only matching items
+            # are built into Issue models
+            for node in items["nodes"]:
+                content = node.get("content")
+                if not content:
+                    continue
+                if repo_filter.state and content["state"] != repo_filter.state:
+                    continue
+                # GitHub timestamps are fixed width UTC so compare as strings
+                if updated_after and content["updatedAt"] < updated_after:
+                    continue
+                if updated_before and content["updatedAt"] > updated_before:
+                    continue
+                if repo_filter.iteration_id and _node_iteration_id(node) != repo_filter.iteration_id:
+                    continue
+                if title_re:
+                    if title_is_literal:
+                        if not content["title"].startswith(repo_filter.title):
+                            continue
+                    elif not title_re.match(content["title"]):
+                        continue
                 # TODO other filter conditions to go here
-                if valid_task:
-                    tasks.append(task)
-        if result["data"]["organization"]["projectV2"]["items"]["pageInfo"]["hasNextPage"]:
-            variables["after"] = result["data"]["organization"]["projectV2"]["items"]["pageInfo"]["endCursor"]
-        else:
-            break
+                tasks.append(Issue.from_gh_json(node))
 
     return tasks
 
@@ -221,39 +276,27 @@ async def get_project_iterations(
     a shallow endpoint and does not include past iterations.
     """
     await ctx.info(f"Getting iterations for {project.organization}/{project.project_number}")
+    cache_key = (project.organization, project.project_number)
+    cached = _iteration_cache.get(cache_key)
+    if cached is not None:
+        return list(cached)
+
     variables = {
         "org": project.organization,
         "number": project.project_number
     }
 
-    if not PAT:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No GitHub Personal Access Token provided, this must be set via `GITHUB_PAT`"
-        )
-
-    headers = {
-        "Authorization": f"Bearer {PAT}",
-        "Accept": "application/vnd.github+json"
-    }
     iterations: list[Iteration] = []
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            GH_API_URL,
-            json={"query": ql.get_iterations, "variables": variables},
-            headers=headers,
-            timeout=30
-        )
-        response.raise_for_status()
-        result = response.json()
+    data = await gh_graphql(GH_API_URL, ql.get_iterations, variables, PAT)
     
     # parse response into list of Iteration objects
-    for node in result["data"]["organization"]["projectV2"]["fields"]["nodes"]:
+    for node in data["organization"]["projectV2"]["fields"]["nodes"]:
         if node.get("name") == "Iteration":
             # this contains all of our iteration info for the project
             for iteration in node["configuration"]["iterations"]:
                 iterations.append(Iteration.from_gh_json(iteration))
-    return iterations
+    _iteration_cache.set(cache_key, iterations)
+    return list(iterations)
 
 
 @mcp.tool()
@@ -261,17 +304,51 @@ async def get_repo_prs(
     pr_filter: RepoPRFilter,
     ctx: Context,
 ) -> list[PullRequest]:
-    return await get_repo_prs_direct(
-        pr_filter=pr_filter, 
-        ctx=ctx, 
-        PAT=PAT, 
+    # cache the models rather than a serialized form, FastMCP serializes the
+    # returned value for the response itself so a pre-serialized result would
+    # only be encoded again. Cached models are shared between callers and
+    # treated as read-only, identical calls made while a fetch is in flight
+    # share it and only the first caller's ctx gets its progress messages
+    prs = await _tool_cache.get_or_create(
+        ("get_repo_prs", pr_filter.model_dump_json()),
+        lambda: get_repo_prs_direct(
+            pr_filter=pr_filter, 
+            ctx=ctx, 
+            PAT=PAT, 
+            GH_API_URL=GH_API_URL
+        ),
+    )
+    # copy so the cached list isn't shared with the caller
+    return list(prs)
+
+@mcp.tool()
+async def get_repos_prs(
+    pr_filters: list[RepoPRFilter],
+    ctx: Context,
+) -> list[list[PullRequest]]:
+    """Get PRs for several repositories at once, with each filter applied to
+    its own repository. Returns the PRs for each filter in the order given.
+    """
+    return await get_repos_prs_direct(
+        pr_filters=pr_filters,
+        ctx=ctx,
+        PAT=PAT,
         GH_API_URL=GH_API_URL
     )
 
+async def _serve() -> None:
+    try:
+        await mcp.run_async(transport="stdio")
+    finally:
+        # release pooled connections to the GitHub API once the server stops,
+        # not in a lifespan as that is entered (and exited) for every session
+        # while the client is shared between them
+        await close_client()
+
 if __name__ == "__main__":
     try:
         print("Starting MCP server...", file=sys.stderr)
-        mcp.run(transport="stdio")
+        asyncio.run(_serve())
     except Exception as e:
         print(f"MCP server failed to start: {e}", file=sys.stderr)
         import traceback
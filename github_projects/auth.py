@@ -1,12 +1,19 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Annotated
-import requests
+import hashlib
+import httpx
+from github_projects.client import get_client
+from github_projects.utils.cache import TTLCache
 
 
 # Security scheme for Bearer token authentication
 security = HTTPBearer()
 
+# tokens that GitHub has recently accepted, keyed by a hash of the token so the
+# raw value isn't held in memory
+_verified_tokens = TTLCache(maxsize=256, ttl=60)
+
 async def verify_github_token(credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]) -> str:
     """
     Verify that the provided token is a valid GitHub PAT.
@@ -22,6 +29,10 @@ async def verify_github_token(credentials: Annotated[HTTPAuthorizationCredential
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+    if _verified_tokens.get(token_key):
+        return token
+    
     # Optional: Test the token by making a simple API call to GitHub
     try:
         headers = {
@@ -29,7 +40,7 @@ async def verify_github_token(credentials: Annotated[HTTPAuthorizationCredential
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28"
         }
-        response = requests.get("https://api.github.com/user", headers=headers, timeout=10)
+        response = await get_client().get("https://api.github.com/user", headers=headers, timeout=10)
         
         if response.status_code != 200:
             raise HTTPException(
@@ -37,10 +48,11 @@ async def verify_github_token(credentials: Annotated[HTTPAuthorizationCredential
                 detail="Invalid or expired GitHub Personal Access Token",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-    except requests.RequestException:
+    except httpx.HTTPError:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Unable to verify GitHub token - service temporarily unavailable",
         )
     
+    _verified_tokens.set(token_key, True)
     return token
\ No newline at end of file
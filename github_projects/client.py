@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
+import orjson
+from fastapi import HTTPException, status
+
+from github_projects import ql
+from github_projects.utils.cache import TTLCache
+
+
+# fetches a page of a GraphQL connection given the cursor to start after
+PageFetcher = Callable[[str | None], Awaitable[dict]]
+
+# shared client so that connections to the GitHub API are pooled and kept alive
+# across tool invocations rather than re-handshaking on every request
+_client: httpx.AsyncClient | None = None
+
+# cap on concurrent requests to GitHub, bursts beyond this tend to trip the
+# secondary rate limits
+_request_semaphore = asyncio.Semaphore(8)
+# attempts made for a request that is rejected by a rate limit
+MAX_ATTEMPTS = 3
+# remaining requests at which we wait for the rate limit window to reset
+RATE_LIMIT_LOW_WATER = 10
+
+# raw GraphQL response bodies for queries that opt in with `max_age`, kept
+# briefly so that repeat queries can be served without a request
+_response_cache = TTLCache(maxsize=32, ttl=60)
+
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        # HTTP/2 multiplexes the concurrent GraphQL requests over a connection
+        # rather than paying for a handshake per pooled connection
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=64),
+            timeout=30,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared async HTTP client if it has been created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _rate_limit_delay(response: httpx.Response) -> float | None:
+    """Get how long GitHub has asked us to wait before the next request, or
+    None if it hasn't. Covers `retry-after` (secondary rate limits) and the
+    primary rate limit running low.
+    """
+    retry_after = response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            # the HTTP-date form isn't parsed, fall back to the rate limit
+            # headers or the caller's backoff
+            pass
+    remaining = response.headers.get("x-ratelimit-remaining")
+    reset = response.headers.get("x-ratelimit-reset")
+    if remaining is not None and reset and int(remaining) < RATE_LIMIT_LOW_WATER:
+        return max(0.0, float(reset) - time.time())
+    return None
+
+
+async def wait_for_rate_limit(response: httpx.Response) -> None:
+    """Sleep before the next request if GitHub has asked us to back off."""
+    delay = _rate_limit_delay(response)
+    if delay:
+        await asyncio.sleep(delay)
+
+
+async def _send(url: str, payload: bytes, headers: dict) -> httpx.Response:
+    """Post to GitHub, retrying with backoff when a rate limit rejects the
+    request. Requests that still fail are returned for the caller to raise.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        async with _request_semaphore:
+            response = await get_client().post(url, content=payload, headers=headers)
+        rate_limited = response.status_code == 429 or (
+            response.status_code == 403
+            and (
+                "retry-after" in response.headers
+                or response.headers.get("x-ratelimit-remaining") == "0"
+            )
+        )
+        if not rate_limited or attempt == MAX_ATTEMPTS - 1:
+            return response
+        delay = _rate_limit_delay(response)
+        await asyncio.sleep(delay if delay is not None else 2 ** attempt)
+    return response
+
+
+@lru_cache(maxsize=32)
+def _encode_query(query: str) -> bytes:
+    """JSON encode a query document once, they are static and several KB each."""
+    return orjson.dumps(query)
+
+
+def _encode_payload(query: str, variables: dict) -> bytes:
+    return b'{"query":' + _encode_query(query) + b',"variables":' + orjson.dumps(variables, option=orjson.OPT_SORT_KEYS) + b"}"
+
+
+async def post_graphql(
+    url: str,
+    query: str,
+    variables: dict,
+    headers: dict,
+    max_age: float | None = None,
+) -> dict:
+    """Post a GraphQL query using the shared client, returning the decoded JSON
+    response. Encoding and decoding use orjson as GitHub responses for a full
+    page of nodes can be several hundred KB.
+
+    Pass `max_age` to cache the response per query, variables and token, a
+    cached response younger than `max_age` seconds (at most the cache TTL) is
+    returned without a request. The raw body is cached and decoded again on
+    every hit so callers each get their own objects to keep or mutate.
+    """
+    payload = _encode_payload(query, variables)
+    cache_key = None
+    if max_age is not None:
+        cache_key = hashlib.sha256(headers.get("Authorization", "").encode() + payload).hexdigest()
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            fetched_at, content = cached
+            if time.monotonic() - fetched_at < max_age:
+                return orjson.loads(content)
+
+    response = await _send(url, payload, {**headers, "Content-Type": "application/json"})
+    response.raise_for_status()
+    await wait_for_rate_limit(response)
+    data = orjson.loads(response.content)
+    if cache_key is not None and "errors" not in data:
+        _response_cache.set(cache_key, (time.monotonic(), response.content))
+    return data
+
+
+def require_pat(PAT: str) -> None:
+    """Raise a 401 if no GitHub Personal Access Token has been configured."""
+    if not PAT:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No GitHub Personal Access Token provided, this must be set via `GITHUB_PAT`"
+        )
+
+
+async def gh_graphql(
+    url: str,
+    query: str,
+    variables: dict,
+    PAT: str,
+    max_age: float | None = None,
+) -> dict:
+    """Run a GraphQL query against GitHub with `PAT`, returning the `data` of
+    the response. GraphQL errors are raised as a 400. See `post_graphql` for
+    `max_age`.
+    """
+    require_pat(PAT)
+
+    headers = {
+        "Authorization": f"Bearer {PAT}",
+        "Accept": "application/vnd.github+json"
+    }
+    result = await post_graphql(url, query, variables, headers, max_age=max_age)
+
+    # Check for GraphQL errors
+    if "errors" in result:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"GitHub API error: {result['errors']}"
+        )
+    return result["data"]
+
+
+async def search_or_list(search_page: PageFetcher | None, list_page: PageFetcher) -> tuple[PageFetcher, dict]:
+    """Choose how to page through a set of results, returning the fetcher to
+    use with its first page. Pages must have `totalCount`, `nodes` and
+    `pageInfo` like a GraphQL connection.
+
+    Search lets GitHub apply filters server side but can only page through the
+    first `ql.SEARCH_RESULT_LIMIT` hits, so larger result sets (or those with
+    nothing to search on, `search_page` None) are listed with `list_page`.
+    """
+    if search_page is not None:
+        first_page = await search_page(None)
+        if first_page["totalCount"] <= ql.SEARCH_RESULT_LIMIT:
+            return search_page, first_page
+    return list_page, await list_page(None)
+
+
+async def iter_pages(
+    fetch_page: PageFetcher,
+    first_page: dict,
+    stop: Callable[[dict], bool] | None = None,
+) -> AsyncIterator[dict]:
+    """Yield `first_page` then each page after it from `fetch_page`, stopping
+    early once `stop(page)` is true for the page just fetched.
+
+    Cursors are opaque so pages can't be fetched out of order, instead the next
+    page is requested as soon as its cursor is known and is in flight while the
+    caller handles the current one. Close the generator (e.g. with
+    `contextlib.aclosing`) if stopping before the last page so the prefetch is
+    cancelled.
+    """
+    page = first_page
+    next_page: asyncio.Task | None = None
+    try:
+        while True:
+            page_info = page["pageInfo"]
+            if page_info["hasNextPage"] and not (stop and stop(page)):
+                next_page = asyncio.create_task(fetch_page(page_info["endCursor"]))
+                # yield once so the next request is sent before the caller starts on this page
+                await asyncio.sleep(0)
+            else:
+                next_page = None
+            yield page
+            if next_page is None:
+                return
+            page = await next_page
+    finally:
+        # don't leave a prefetch running if the caller stopped early
+        if next_page is not None and not next_page.done():
+            next_page.cancel()
@@ -1,3 +1,5 @@
+import re
+
 get_project_details = """
 query($org: String!, $number: Int!) {
   organization(login: $org) {
@@ -88,11 +90,11 @@ query($org: String!, $number: Int!, $after: String) {
   organization(login: $org) {
     projectV2(number: $number) {
       items(first: 100, after: $after) {
+        totalCount
         nodes {
           content {
             ... on Issue {
               id
-              number
               title
               url
               state
@@ -146,6 +148,124 @@ query($org: String!, $number: Int!, $after: String) {
 }
 """
 
+# GitHub search only returns the first 1000 results for any query
+SEARCH_RESULT_LIMIT = 1000
+
+# graphql query for searching a project's issues, used to push state and
+# updated filters down to GitHub
+search_project_issues = """
+query($q: String!, $after: String) {
+  search(query: $q, type: ISSUE, first: 100, after: $after) {
+    issueCount
+    nodes {
+      ... on Issue {
+        id
+        title
+        url
+        state
+        body
+        createdAt
+        updatedAt
+        closedAt
+        author {
+          login
+          url
+        }
+        assignees(first: 10) {
+          nodes {
+            login
+            url
+          }
+        }
+        labels(first: 10) {
+          nodes {
+            name
+            color
+          }
+        }
+        repository {
+          nameWithOwner
+          url
+        }
+        projectItems(first: 10) {
+          nodes {
+            project {
+              number
+              owner {
+                ... on Organization {
+                  login
+                }
+              }
+            }
+            fieldValues(first: 20) {
+              nodes {
+                ... on ProjectV2ItemFieldIterationValue {
+                  iterationId
+                  field {
+                    ... on ProjectV2IterationField {
+                      id
+                      name
+                    }
+                  }
+                }
+              }
+            }
+          }
+          pageInfo {
+            hasNextPage
+            endCursor
+          }
+        }
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+"""
+
+# graphql query for paging through an issue's project items, used when the
+# project being searched isn't among the first items returned by search
+get_issue_project_items = """
+query($id: ID!, $after: String) {
+  node(id: $id) {
+    ... on Issue {
+      projectItems(first: 100, after: $after) {
+        nodes {
+          project {
+            number
+            owner {
+              ... on Organization {
+                login
+              }
+            }
+          }
+          fieldValues(first: 20) {
+            nodes {
+              ... on ProjectV2ItemFieldIterationValue {
+                iterationId
+                field {
+                  ... on ProjectV2IterationField {
+                    id
+                    name
+                  }
+                }
+              }
+            }
+          }
+        }
+        pageInfo {
+          hasNextPage
+          endCursor
+        }
+      }
+    }
+  }
+}
+"""
+
 # graphql query for getting PRs
 get_prs = """
 query($org: String!, $number: Int!, $after: String) {
@@ -166,7 +286,6 @@ query($org: String!, $number: Int!, $after: String) {
               closedAt
               mergedAt
               merged
-              mergeable
               author {
                 login
                 url
@@ -226,9 +345,10 @@ query($org: String!, $number: Int!, $after: String) {
 }
 """
 
-# GraphQL query for getting PRs directly from repository
+# GraphQL query for getting PRs directly from repository, pass `full: false` to
+# skip the body, assignees, labels and reviews when only PR stats are needed
 get_repo_prs_direct = """
-query($owner: String!, $name: String!, $after: String) {
+query($owner: String!, $name: String!, $after: String, $full: Boolean = true) {
   repository(owner: $owner, name: $name) {
     pullRequests(
       first: 100, 
@@ -236,45 +356,45 @@ query($owner: String!, $name: String!, $after: String) {
       states: [MERGED, CLOSED, OPEN], 
       orderBy: {field: UPDATED_AT, direction: DESC}
     ) {
+      totalCount
       nodes {
         id
         number
         title
-        url
+        url @include(if: $full)
         state
-        body
+        body @include(if: $full)
         createdAt
         updatedAt
-        closedAt
+        closedAt @include(if: $full)
         mergedAt
         merged
-        mergeable
         author {
           login
           url
         }
-        assignees(first: 10) {
+        assignees(first: 10) @include(if: $full) {
           nodes {
             login
             url
           }
         }
-        labels(first: 10) {
+        labels(first: 10) @include(if: $full) {
           nodes {
             name
             color
           }
         }
-        repository {
+        repository @include(if: $full) {
           nameWithOwner
           url
         }
         baseRefName
-        headRefName
+        headRefName @include(if: $full)
         additions
         deletions
         changedFiles
-        reviews(first: 10) {
+        reviews(first: 10) @include(if: $full) {
           nodes {
             state
             author {
@@ -282,14 +402,6 @@ query($owner: String!, $name: String!, $after: String) {
             }
           }
         }
-        commits(first: 1) {
-          nodes {
-            commit {
-              authoredDate
-              message
-            }
-          }
-        }
       }
       pageInfo {
         hasNextPage
@@ -298,4 +410,97 @@ query($owner: String!, $name: String!, $after: String) {
     }
   }
 }
-"""
\ No newline at end of file
+"""
+
+# graphql query for searching a repository's PRs, used to push filters down to
+# GitHub, returns the same fields as `get_repo_prs_direct` in the order set by a
+# `sort:` qualifier in the search query
+search_repo_prs = """
+query($q: String!, $after: String, $full: Boolean = true) {
+  search(query: $q, type: ISSUE, first: 100, after: $after) {
+    issueCount
+    nodes {
+      ... on PullRequest {
+        id
+        number
+        title
+        url @include(if: $full)
+        state
+        body @include(if: $full)
+        createdAt
+        updatedAt
+        closedAt @include(if: $full)
+        mergedAt
+        merged
+        author {
+          login
+          url
+        }
+        assignees(first: 10) @include(if: $full) {
+          nodes {
+            login
+            url
+          }
+        }
+        labels(first: 10) @include(if: $full) {
+          nodes {
+            name
+            color
+          }
+        }
+        repository @include(if: $full) {
+          nameWithOwner
+          url
+        }
+        baseRefName
+        headRefName @include(if: $full)
+        additions
+        deletions
+        changedFiles
+        reviews(first: 10) @include(if: $full) {
+          nodes {
+            state
+            author {
+              login
+            }
+          }
+        }
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+"""
+
+
+def batch_query(queries: dict[str, tuple[str, dict]]) -> tuple[str, dict]:
+    """Combine several of the queries above into one document so they can be
+    sent to GitHub in a single request.
+
+    `queries` maps an alias to a `(query, variables)` pair. Each query's root
+    field is aliased with its key and its variables are suffixed with `_<key>`
+    to keep them apart, the results can then be read back from `data[<key>]`.
+    Returns the combined query and variables.
+    """
+    definitions: list[str] = []
+    bodies: list[str] = []
+    batch_variables: dict = {}
+    for alias, (query, variables) in queries.items():
+        match = re.fullmatch(r"\s*query\s*\((.*?)\)\s*\{(.*)\}\s*", query, re.DOTALL)
+        if not match:
+            raise ValueError(f"Query for '{alias}' can't be batched")
+        var_defs, body = match.groups()
+        names = set(re.findall(r"\$(\w+)\s*:", var_defs))
+
+        def rename(m: re.Match) -> str:
+            return f"${m.group(1)}_{alias}" if m.group(1) in names else m.group(0)
+
+        definitions.append(re.sub(r"\$(\w+)", rename, var_defs.strip()))
+        # alias the root field so each query's result lands under its own key
+        bodies.append(re.sub(r"^\s*(\w+)", f"  {alias}: \\1", re.sub(r"\$(\w+)", rename, body), count=1))
+        batch_variables.update({f"{name}_{alias}": value for name, value in variables.items()})
+    query = "query(" + ", ".join(definitions) + ") {\n" + "\n".join(b.rstrip() for b in bodies) + "\n}\n"
+    return query, batch_variables
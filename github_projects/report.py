@@ -1,127 +1,302 @@
-from datetime import datetime
+from contextlib import aclosing
+from datetime import date, datetime
+import html
 import re
-import httpx
-from typing import Any
-from collections import defaultdict
-from fastapi import HTTPException, status
+from typing import Any, AsyncIterator
+from collections import Counter
+from dataclasses import dataclass, field
+from operator import itemgetter
+import orjson
 from fastmcp import Context
 from pydantic import BaseModel
-from github_projects.schemas import RepoPRFilter, PullRequest
-from github_projects.utils.datetime_utils import normalize_datetime_for_comparison, ensure_timezone_aware
+from github_projects.schemas import RepoPRFilter, PullRequest, PullRequestStats
+from github_projects.utils.datetime_utils import normalize_datetime_for_comparison, ensure_timezone_aware, to_github_timestamp, to_search_range
 from github_projects import ql
+from github_projects.client import gh_graphql, iter_pages, search_or_list
+
+# most repositories to fetch a page of PRs for in one batched request
+MAX_BATCH_REPOS = 10
+
+class _PRNodeFilter:
+    """Applies a `RepoPRFilter` to pages of raw PR nodes, building the PRs
+    that match"""
+
+    def __init__(self, pr_filter: RepoPRFilter, include_details: bool = True):
+        self.pr_filter = pr_filter
+        self.build_pr = PullRequest.from_gh_json_direct if include_details else PullRequestStats.from_gh_json_direct
+
+        # PRs come back most recently updated first and a PR can't be created or
+        # merged after its last update, so once a page is older than every lower
+        # bound in the filter no later page can match either
+        self.merged_after = normalize_datetime_for_comparison(pr_filter.merged_after)
+        self.merged_before = normalize_datetime_for_comparison(pr_filter.merged_before)
+        self.created_after = normalize_datetime_for_comparison(pr_filter.created_after)
+        self.created_before = normalize_datetime_for_comparison(pr_filter.created_before)
+        lower_bounds = [
+            bound for bound in (
+                normalize_datetime_for_comparison(pr_filter.updated_after),
+                self.merged_after,
+                self.created_after,
+            ) if bound
+        ]
+        self.oldest_wanted = to_github_timestamp(max(lower_bounds), round_up=True) if lower_bounds else None
+        # GitHub timestamps are fixed width UTC so raw values can be compared as strings
+        self.updated_after = to_github_timestamp(pr_filter.updated_after, round_up=True)
+        self.updated_before = to_github_timestamp(pr_filter.updated_before)
+        self.title_re = pr_filter.title_re
+
+    def past_oldest_wanted(self, nodes: list[dict]) -> bool:
+        """Check whether no page after `nodes` can contain a matching PR"""
+        return bool(self.oldest_wanted and nodes and nodes[-1]["updatedAt"] < self.oldest_wanted)
+
+    def __call__(self, nodes: list[dict]) -> list[PullRequest] | list[PullRequestStats]:
+        pr_filter = self.pr_filter
+        title_re = self.title_re
+        merged_after, merged_before = self.merged_after, self.merged_before
+        created_after, created_before = self.created_after, self.created_before
+        updated_after, updated_before = self.updated_after, self.updated_before
+
+        prs: list[PullRequest] | list[PullRequestStats] = []
+        for node in nodes:
+            # check the update window on the raw node before building the PR
+            if updated_after and node["updatedAt"] < updated_after:
+                continue
+            if updated_before and node["updatedAt"] > updated_before:
+                continue
+
+            # then the cheap exact match filters, still on the raw node
+            if pr_filter.state and node.get("state") != pr_filter.state:
+                continue
+            if pr_filter.merged_only and not node.get("merged"):
+                continue
+            if pr_filter.author and (node.get("author") or {}).get("login") != pr_filter.author:
+                continue
+            if pr_filter.base_ref and node.get("baseRefName") != pr_filter.base_ref:
+                continue
+            if title_re and not title_re.match(node.get("title") or ""):
+                continue
+
+            pr = self.build_pr(node)
+
+            # finally the merged and created windows on the parsed dates
+            if merged_after or merged_before:
+                if not pr.mergedAt:
+                    continue
+                normalized_merged_at = normalize_datetime_for_comparison(pr.mergedAt)
+                if normalized_merged_at and (
+                    (merged_after and normalized_merged_at < merged_after)
+                    or (merged_before and normalized_merged_at > merged_before)
+                ):
+                    continue
+            if created_after or created_before:
+                normalized_created_at = normalize_datetime_for_comparison(pr.createdAt)
+                if normalized_created_at and (
+                    (created_after and normalized_created_at < created_after)
+                    or (created_before and normalized_created_at > created_before)
+                ):
+                    continue
+
+            prs.append(pr)
+        return prs
+
+# search qualifiers for each PR state, search's is:closed also matches merged PRs
+_PR_STATE_QUALIFIERS = {
+    "OPEN": ["is:open"],
+    "CLOSED": ["is:closed", "is:unmerged"],
+    "MERGED": ["is:merged"],
+}
+
+def _repo_pr_search_query(pr_filter: RepoPRFilter) -> str | None:
+    """Build a GitHub search query for the repository's PRs that applies as much
+    of `pr_filter` as search supports server side. Results still go through
+    `_PRNodeFilter` so the query only needs to match a superset. Returns None
+    when there is nothing for search to filter on.
+    """
+    qualifiers = []
+    if pr_filter.state:
+        state_qualifiers = _PR_STATE_QUALIFIERS.get(pr_filter.state)
+        if state_qualifiers is None:
+            return None
+        qualifiers.extend(state_qualifiers)
+    if pr_filter.merged_only:
+        qualifiers.append("is:merged")
+    # author is left to `_PRNodeFilter`, GitHub Apps have an `author.login` such
+    # as "dependabot" but search only matches them as "author:app/dependabot"
+    if pr_filter.base_ref:
+        # values with spaces or quotes can't be passed as a bare qualifier
+        if any(c.isspace() or c == '"' for c in pr_filter.base_ref):
+            return None
+        qualifiers.append(f"base:{pr_filter.base_ref}")
+    for date_range in (
+        to_search_range("merged", pr_filter.merged_after, pr_filter.merged_before),
+        to_search_range("created", pr_filter.created_after, pr_filter.created_before),
+        to_search_range("updated", pr_filter.updated_after, pr_filter.updated_before),
+    ):
+        if date_range:
+            qualifiers.append(date_range)
+    if not qualifiers:
+        return None
+    # keep the most recently updated first order the early stop relies on
+    return " ".join([f"repo:{pr_filter.owner}/{pr_filter.name}", "is:pr", *qualifiers, "sort:updated-desc"])
 
 async def get_repo_prs_direct(
     pr_filter: RepoPRFilter,
     ctx: Context,
     PAT: str,
     GH_API_URL: str,
-) -> list[PullRequest]:
+    include_details: bool = True,
+) -> list[PullRequest] | list[PullRequestStats]:
+    """Get a repository's PRs matching `pr_filter`. With `include_details` off
+    only PR stats are fetched and PRs are returned as lightweight
+    `PullRequestStats` records rather than full `PullRequest` models.
+    """
+    prs: list[PullRequest] | list[PullRequestStats] = []
+    async for page in iter_repo_prs_direct(pr_filter, ctx, PAT, GH_API_URL, include_details):
+        prs.extend(page)
+    return prs
+
+async def iter_repo_prs_direct(
+    pr_filter: RepoPRFilter,
+    ctx: Context,
+    PAT: str,
+    GH_API_URL: str,
+    include_details: bool = True,
+) -> AsyncIterator[list[PullRequest] | list[PullRequestStats]]:
+    """Same as `get_repo_prs_direct` but yields the matching PRs a page at a
+    time, so callers can process each page as it arrives.
+    """
     await ctx.info(f"Getting PRs for {pr_filter.owner}/{pr_filter.name}")
     variables = {
         "owner": pr_filter.owner,
         "name": pr_filter.name,
         "after": None,
+        "full": include_details,
     }
+    filter_page = _PRNodeFilter(pr_filter, include_details)
 
-    if not PAT:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No GitHub Personal Access Token provided, this must be set via `GITHUB_PAT`"
+    async def fetch_repo_prs(after: str | None) -> dict:
+        await ctx.debug(f"On page cursor={after}")
+
+        # the shared client keeps the connection to GitHub alive between pages
+        data = await gh_graphql(GH_API_URL, ql.get_repo_prs_direct, {**variables, "after": after}, PAT)
+        return data["repository"]["pullRequests"]
+
+    async def search_repo_prs(after: str | None) -> dict:
+        await ctx.debug(f"On search page cursor={after}")
+        data = await gh_graphql(
+            GH_API_URL, ql.search_repo_prs, {"q": search_query, "after": after, "full": include_details}, PAT
         )
+        search = data["search"]
+        # reshape search hits to look like a page of the repository's PRs
+        return {
+            "totalCount": search["issueCount"],
+            "nodes": [node for node in search["nodes"] if node],
+            "pageInfo": search["pageInfo"],
+        }
 
-    headers = {
-        "Authorization": f"Bearer {PAT}",
-        "Accept": "application/vnd.github+json"
-    }
-    prs: list[PullRequest] = []
-
-    while True:
-        print(f"On page {variables['after']}")
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                GH_API_URL,
-                json={"query": ql.get_repo_prs_direct, "variables": variables},
-                headers=headers,
-                timeout=30
-            )
-            response.raise_for_status()
-            result = response.json()
-        
-        # Check for errors
-        if "errors" in result:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"GraphQL errors: {result['errors']}"
-            )
-        
-        # Get all PR nodes
-        nodes = result["data"]["repository"]["pullRequests"]["nodes"]
-        for node in nodes:
-            valid_pr = True
-            pr = PullRequest.from_gh_json_direct(node)
-            
-            # Apply filters (same filtering logic as before)
-            if pr_filter.title:
-                if not re.match(pr_filter.title, pr.title):
-                    valid_pr = False
-                    
-            if pr_filter.state and (pr.state != pr_filter.state):
-                valid_pr = False
-                
-            if pr_filter.merged_only and not pr.merged:
-                valid_pr = False
-                
-            if pr_filter.merged_after:
-                normalized_merged_at = normalize_datetime_for_comparison(pr.mergedAt)
-                normalized_merged_after = normalize_datetime_for_comparison(pr_filter.merged_after)
-                if not pr.mergedAt or (normalized_merged_at and normalized_merged_after and normalized_merged_at < normalized_merged_after):
-                    valid_pr = False
-                
-            if pr_filter.merged_before:
-                normalized_merged_at = normalize_datetime_for_comparison(pr.mergedAt)
-                normalized_merged_before = normalize_datetime_for_comparison(pr_filter.merged_before)
-                if not pr.mergedAt or (normalized_merged_at and normalized_merged_before and normalized_merged_at > normalized_merged_before):
-                    valid_pr = False
-                
-            if pr_filter.updated_after:
-                normalized_updated_at = normalize_datetime_for_comparison(pr.updatedAt)
-                normalized_updated_after = normalize_datetime_for_comparison(pr_filter.updated_after)
-                if normalized_updated_at and normalized_updated_after and normalized_updated_at < normalized_updated_after:
-                    valid_pr = False
-                
-            if pr_filter.updated_before:
-                normalized_updated_at = normalize_datetime_for_comparison(pr.updatedAt)
-                normalized_updated_before = normalize_datetime_for_comparison(pr_filter.updated_before)
-                if normalized_updated_at and normalized_updated_before and normalized_updated_at > normalized_updated_before:
-                    valid_pr = False
-                
-            if pr_filter.created_after:
-                normalized_created_at = normalize_datetime_for_comparison(pr.createdAt)
-                normalized_created_after = normalize_datetime_for_comparison(pr_filter.created_after)
-                if normalized_created_at and normalized_created_after and normalized_created_at < normalized_created_after:
-                    valid_pr = False
-                
-            if pr_filter.created_before:
-                normalized_created_at = normalize_datetime_for_comparison(pr.createdAt)
-                normalized_created_before = normalize_datetime_for_comparison(pr_filter.created_before)
-                if normalized_created_at and normalized_created_before and normalized_created_at > normalized_created_before:
-                    valid_pr = False
-                
-            if pr_filter.author and (not pr.author or pr.author.get("login") != pr_filter.author):
-                valid_pr = False
-                
-            if pr_filter.base_ref and (pr.baseRefName != pr_filter.base_ref):
-                valid_pr = False
+    # let GitHub apply what it can of the filter
+    search_query = _repo_pr_search_query(pr_filter)
+    fetch_page, pull_requests = await search_or_list(
+        search_repo_prs if search_query else None, fetch_repo_prs
+    )
+    await ctx.info(f"Found {pull_requests['totalCount']} pull requests")
 
-            if valid_pr:
-                prs.append(pr)
-                
-        if result["data"]["repository"]["pullRequests"]["pageInfo"]["hasNextPage"]:
-            variables["after"] = result["data"]["repository"]["pullRequests"]["pageInfo"]["endCursor"]
-        else:
-            break
-    return prs
+    pages = iter_pages(
+        fetch_page, pull_requests, stop=lambda page: filter_page.past_oldest_wanted(page["nodes"])
+    )
+    async with aclosing(pages) as pages:
+        async for pull_requests in pages:
+            prs = filter_page(pull_requests["nodes"])
+            if prs:
+                yield prs
+
+async def get_repos_prs_direct(
+    pr_filters: list[RepoPRFilter],
+    ctx: Context,
+    PAT: str,
+    GH_API_URL: str,
+    include_details: bool = True,
+) -> list[list[PullRequest] | list[PullRequestStats]]:
+    """Get the PRs matching each of `pr_filters`, as `get_repo_prs_direct`
+    does for one. Pages for up to `MAX_BATCH_REPOS` repositories are fetched
+    together in a single aliased GraphQL request. Returns the PRs for each
+    filter in the same order as `pr_filters`.
+    """
+    await ctx.info(f"Getting PRs for {len(pr_filters)} repositories")
+    filters = [_PRNodeFilter(pr_filter, include_details) for pr_filter in pr_filters]
+    results: list[list[PullRequest] | list[PullRequestStats]] = [[] for _ in pr_filters]
+    # cursor for the next page of each repository that still has pages to fetch
+    cursors: dict[int, str | None] = {i: None for i in range(len(pr_filters))}
+
+    while cursors:
+        batch = list(cursors.items())[:MAX_BATCH_REPOS]
+        query, variables = ql.batch_query({
+            f"r{i}": (ql.get_repo_prs_direct, {
+                "owner": pr_filters[i].owner,
+                "name": pr_filters[i].name,
+                "after": after,
+                "full": include_details,
+            })
+            for i, after in batch
+        })
+        await ctx.debug(f"Fetching pages for {len(batch)} repositories")
+        data = await gh_graphql(GH_API_URL, query, variables, PAT)
+
+        for i, _ in batch:
+            pull_requests = data[f"r{i}"]["pullRequests"]
+            nodes = pull_requests["nodes"]
+            results[i].extend(filters[i](nodes))
+            page_info = pull_requests["pageInfo"]
+            if page_info["hasNextPage"] and not filters[i].past_oldest_wanted(nodes):
+                cursors[i] = page_info["endCursor"]
+            else:
+                del cursors[i]
+    return results
+
+# PR types by the title prefix that marks them, titles matching none are "other"
+_PR_TYPE_PREFIX_RE = re.compile(r"feat|fix|refactor|chore|docs|test")
+_PR_TYPES = {
+    "feat": "features",
+    "fix": "fixes",
+    "refactor": "refactors",
+    "chore": "chores",
+    "docs": "documentation",
+    "test": "tests",
+}
+
+def _pr_type(title: str | None) -> str:
+    """Get the type of a PR from its title prefix"""
+    match = _PR_TYPE_PREFIX_RE.match(title.lower()) if title else None
+    return _PR_TYPES[match.group()] if match else "other"
+
+@dataclass(slots=True)
+class _DayStats:
+    """Running totals for PRs merged on one day"""
+    additions: int = 0
+    deletions: int = 0
+    prs: int = 0
+    net_change: int = 0
+    files_changed: int = 0
+    authors: set[str] = field(default_factory=set)
+
+@dataclass(slots=True)
+class _ContributorStats:
+    """Running totals for one contributor's merged PRs"""
+    # normalized merge dates, used for comparisons
+    first_merged: datetime
+    last_merged: datetime
+    # merge dates as given, used for display
+    first_contribution: datetime
+    last_contribution: datetime
+    prs: int = 0
+    additions: int = 0
+    deletions: int = 0
+    files_changed: int = 0
+
+def _to_js(value: Any) -> str:
+    """Serialize `value` as a JS literal that is safe to inline in a <script>"""
+    # escape "<" so that a "</script>" in e.g. a login can't close the tag
+    return orjson.dumps(value).decode().replace("<", "\\u003c")
 
 class AnalyticsData(BaseModel):
     """Container for processed analytics data"""
@@ -134,8 +309,12 @@ class AnalyticsData(BaseModel):
 class PRAnalyzer:
     """Analyzes pull request data and generates insights"""
     
-    def __init__(self, pull_requests: list[Any]):
-        self.pull_requests = pull_requests
+    def __init__(self, pull_requests: list[Any] | None = None):
+        self.pull_requests = pull_requests if pull_requests is not None else []
+
+    def ingest_batch(self, pull_requests: list[Any]) -> None:
+        """Add a batch of PRs, e.g. a page as it is fetched, to be analyzed"""
+        self.pull_requests.extend(pull_requests)
         
     def analyze_time_period(self, start_date: datetime | None = None, 
                           end_date: datetime | None = None) -> AnalyticsData:
@@ -147,20 +326,19 @@ class PRAnalyzer:
         if not filtered_prs:
             raise ValueError("No pull requests found in the specified time period")
         
-        # Determine actual time period from data
-        time_period = self._get_time_period(filtered_prs)
-        
+        daily_stats, contributors, pr_types, total_stats, time_period = self._aggregate_all(filtered_prs)
         return AnalyticsData(
-            daily_stats=self._calculate_daily_stats(filtered_prs),
-            contributor_analysis=self._analyze_contributors(filtered_prs),
-            pr_type_analysis=self._analyze_pr_types(filtered_prs),
-            total_stats=self._calculate_total_stats(filtered_prs),
+            daily_stats=daily_stats,
+            contributor_analysis=contributors,
+            pr_type_analysis=pr_types,
+            total_stats=total_stats,
             time_period=time_period
         )
     
     def _filter_prs_by_date(self, start_date: datetime | None, 
-                           end_date: datetime | None) -> list[Any]:
-        """Filter PRs by merge date within specified range"""
+                           end_date: datetime | None) -> list[tuple[Any, datetime]]:
+        """Filter PRs by merge date within specified range, returning each PR
+        with its normalized merge date"""
         filtered = []
         
         # Normalize filter dates for comparison
@@ -181,156 +359,109 @@ class PRAnalyzer:
             if end_dt and merge_date > end_dt:
                 continue
                 
-            filtered.append(pr)
+            filtered.append((pr, merge_date))
         
         return filtered
     
-    def _get_time_period(self, prs: list[Any]) -> dict[str, datetime]:
-        """Get the actual time period covered by the PR data"""
-        merge_dates = []
-        for pr in prs:
-            if pr.mergedAt:
-                normalized_date = normalize_datetime_for_comparison(pr.mergedAt)
-                if normalized_date:
-                    merge_dates.append(normalized_date)
-        
-        if not merge_dates:
-            now = ensure_timezone_aware(datetime.now())
-            if now:
-                return {"start": now, "end": now}
-            else:
-                # Fallback to naive datetime if timezone conversion fails
-                return {"start": datetime.now(), "end": datetime.now()}
-        
-        start_date = min(merge_dates)
-        end_date = max(merge_dates)
-        
-        return {
-            "start": start_date,
-            "end": end_date
-        }
-    
-    def _calculate_daily_stats(self, prs: list[Any]) -> list[dict[str, Any]]:
-        """Calculate daily statistics"""
-        daily_data = defaultdict(lambda: {
-            "additions": 0,
-            "deletions": 0,
-            "prs": 0,
-            "net_change": 0,
-            "authors": set(),
-            "files_changed": 0
-        })
-        
-        for pr in prs:
-            if not pr.mergedAt:
-                continue
-                
-            day_key = pr.mergedAt.strftime("%Y-%m-%d")
-            day_data = daily_data[day_key]
+    def _aggregate_all(self, prs: list[tuple[Any, datetime]]) -> tuple[
+        list[dict[str, Any]], dict[str, dict[str, Any]], dict[str, int], dict[str, Any], dict[str, datetime]
+    ]:
+        """Calculate the daily, contributor, PR type and total statistics along
+        with the time period covered by merged PRs, given with their normalized
+        merge dates, in a single pass over them"""
+        daily_data: dict[str, _DayStats] = {}
+        contributors: dict[str, _ContributorStats] = {}
+        pr_types = Counter()
+        authors = set()
+        start_date = None
+        end_date = None
+        # day with the most additions, ties going to the earliest day
+        peak_day_key = None
+        peak_day_additions = -1
+        
+        for pr, normalized_merged_at in prs:
+            additions = pr.additions
+            deletions = pr.deletions
+            changed_files = pr.changedFiles
+            login = pr.author.get("login") if pr.author else None
+            
+            pr_types[_pr_type(pr.title)] += 1
             
-            day_data["additions"] += pr.additions
-            day_data["deletions"] += pr.deletions
-            day_data["prs"] += 1
-            day_data["net_change"] += (pr.additions - pr.deletions)
-            day_data["files_changed"] += pr.changedFiles
+            if start_date is None or normalized_merged_at < start_date:
+                start_date = normalized_merged_at
+            if end_date is None or normalized_merged_at > end_date:
+                end_date = normalized_merged_at
             
-            if pr.author and pr.author.get("login"):
-                day_data["authors"].add(pr.author["login"])
+            day_key = pr.mergedAt.date().isoformat()
+            day = daily_data.get(day_key)
+            if day is None:
+                day = daily_data[day_key] = _DayStats()
+            day.additions += additions
+            day.deletions += deletions
+            day.prs += 1
+            day.net_change += (additions - deletions)
+            day.files_changed += changed_files
+            if day.additions > peak_day_additions or (
+                day.additions == peak_day_additions and day_key < peak_day_key
+            ):
+                peak_day_key = day_key
+                peak_day_additions = day.additions
+            if login:
+                day.authors.add(login)
+            
+            if not login:
+                continue
+            authors.add(login)
+            contrib = contributors.get(login)
+            if contrib is None:
+                contrib = contributors[login] = _ContributorStats(
+                    normalized_merged_at, normalized_merged_at, pr.mergedAt, pr.mergedAt
+                )
+            elif normalized_merged_at < contrib.first_merged:
+                contrib.first_merged = normalized_merged_at
+                contrib.first_contribution = pr.mergedAt
+            elif normalized_merged_at > contrib.last_merged:
+                contrib.last_merged = normalized_merged_at
+                contrib.last_contribution = pr.mergedAt
+            contrib.prs += 1
+            contrib.additions += additions
+            contrib.deletions += deletions
+            contrib.files_changed += changed_files
         
         # Convert to list and add metadata
         daily_stats = []
-        for date_str, data in sorted(daily_data.items()):
+        for date_str, day in sorted(daily_data.items()):
             daily_stats.append({
                 "date": date_str,
-                "additions": data["additions"],
-                "deletions": data["deletions"],
-                "prs": data["prs"],
-                "net_change": data["net_change"],
-                "files_changed": data["files_changed"],
-                "author_count": len(data["authors"]),
-                "authors": list(data["authors"])
+                "additions": day.additions,
+                "deletions": day.deletions,
+                "prs": day.prs,
+                "net_change": day.net_change,
+                "files_changed": day.files_changed,
+                "author_count": len(day.authors),
+                "authors": list(day.authors)
             })
         
-        return daily_stats
-    
-    def _analyze_contributors(self, prs: list[Any]) -> dict[str, dict[str, Any]]:
-        """Analyze contributor statistics"""
-        contributors = defaultdict(lambda: {
-            "prs": 0,
-            "additions": 0,
-            "deletions": 0,
-            "files_changed": 0,
-            "first_contribution": None,
-            "last_contribution": None
-        })
-        
-        for pr in prs:
-            if not pr.author or not pr.author.get("login"):
-                continue
-                
-            author = pr.author["login"]
-            contrib = contributors[author]
-            
-            contrib["prs"] += 1
-            contrib["additions"] += pr.additions
-            contrib["deletions"] += pr.deletions
-            contrib["files_changed"] += pr.changedFiles
-            
-            if pr.mergedAt:
-                normalized_merged_at = normalize_datetime_for_comparison(pr.mergedAt)
-                if normalized_merged_at:
-                    first_contrib = contrib["first_contribution"]
-                    last_contrib = contrib["last_contribution"]
-                    
-                    if not first_contrib or (normalized_merged_at < normalize_datetime_for_comparison(first_contrib)):
-                        contrib["first_contribution"] = pr.mergedAt
-                    if not last_contrib or (normalized_merged_at > normalize_datetime_for_comparison(last_contrib)):
-                        contrib["last_contribution"] = pr.mergedAt
-        
         # Add calculated fields
-        for author, stats in contributors.items():
-            stats["net_change"] = stats["additions"] - stats["deletions"]
-            stats["avg_additions_per_pr"] = stats["additions"] / stats["prs"] if stats["prs"] > 0 else 0
-            stats["avg_deletions_per_pr"] = stats["deletions"] / stats["prs"] if stats["prs"] > 0 else 0
-        
-        return dict(contributors)
-    
-    def _analyze_pr_types(self, prs: list[Any]) -> dict[str, int]:
-        """Analyze PR types based on title prefixes"""
-        pr_types = defaultdict(int)
-        
-        for pr in prs:
-            title = pr.title.lower() if pr.title else ""
-            
-            if title.startswith("feat"):
-                pr_types["features"] += 1
-            elif title.startswith("fix"):
-                pr_types["fixes"] += 1
-            elif title.startswith("refactor"):
-                pr_types["refactors"] += 1
-            elif title.startswith("chore"):
-                pr_types["chores"] += 1
-            elif title.startswith("docs"):
-                pr_types["documentation"] += 1
-            elif title.startswith("test"):
-                pr_types["tests"] += 1
-            else:
-                pr_types["other"] += 1
-        
-        return dict(pr_types)
-    
-    def _calculate_total_stats(self, prs: list[Any]) -> dict[str, Any]:
-        """Calculate overall statistics"""
-        total_additions = sum(pr.additions for pr in prs)
-        total_deletions = sum(pr.deletions for pr in prs)
-        total_files = sum(pr.changedFiles for pr in prs)
-        
-        authors = set()
-        for pr in prs:
-            if pr.author and pr.author.get("login"):
-                authors.add(pr.author["login"])
-        
-        return {
+        contributor_analysis = {}
+        for author, contrib in contributors.items():
+            contributor_analysis[author] = {
+                "prs": contrib.prs,
+                "additions": contrib.additions,
+                "deletions": contrib.deletions,
+                "files_changed": contrib.files_changed,
+                "first_contribution": contrib.first_contribution,
+                "last_contribution": contrib.last_contribution,
+                "net_change": contrib.additions - contrib.deletions,
+                "avg_additions_per_pr": contrib.additions / contrib.prs if contrib.prs > 0 else 0,
+                "avg_deletions_per_pr": contrib.deletions / contrib.prs if contrib.prs > 0 else 0,
+            }
+        
+        # totals are summed over days rather than accumulated per PR
+        total_additions = sum(day.additions for day in daily_data.values())
+        total_deletions = sum(day.deletions for day in daily_data.values())
+        total_files = sum(day.files_changed for day in daily_data.values())
+        total_stats = {
             "total_prs": len(prs),
             "total_additions": total_additions,
             "total_deletions": total_deletions,
@@ -340,55 +471,25 @@ class PRAnalyzer:
             "contributors": list(authors),
             "avg_additions_per_pr": total_additions / len(prs) if prs else 0,
             "avg_deletions_per_pr": total_deletions / len(prs) if prs else 0,
-            "avg_files_per_pr": total_files / len(prs) if prs else 0
+            "avg_files_per_pr": total_files / len(prs) if prs else 0,
+            "peak_day": peak_day_key,
+            "peak_day_additions": peak_day_additions if peak_day_key else 0
         }
-
-class HTMLReportGenerator:
-    """Generates HTML reports from analytics data"""
-    
-    def __init__(self, analytics_data: AnalyticsData):
-        self.data = analytics_data
-    
-    def generate_report(self, title: str = "Pull Request Analytics Report") -> str:
-        """Generate complete HTML report"""
         
-        # Format time period
-        start_date = self.data.time_period["start"].strftime("%B %d, %Y")
-        end_date = self.data.time_period["end"].strftime("%B %d, %Y")
-        period_str = f"{start_date} - {end_date}"
-        
-        html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/Chart.js/3.9.1/chart.min.js"></script>
-    {self._get_styles()}
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🚀 {title}</h1>
-            <p>Development Activity Report - {period_str}</p>
-        </div>
-        
-        {self._generate_stats_cards()}
-        {self._generate_daily_chart_section()}
-        {self._generate_contributor_charts()}
-        {self._generate_contributor_table()}
-        {self._generate_insights()}
-    </div>
-    
-    {self._generate_javascript()}
-</body>
-</html>"""
+        if start_date is None:
+            now = ensure_timezone_aware(datetime.now())
+            if now:
+                time_period = {"start": now, "end": now}
+            else:
+                # Fallback to naive datetime if timezone conversion fails
+                time_period = {"start": datetime.now(), "end": datetime.now()}
+        else:
+            time_period = {"start": start_date, "end": end_date}
         
-        return html
-    
-    def _get_styles(self) -> str:
-        """Get CSS styles for the report"""
-        return """
+        return daily_stats, contributor_analysis, dict(pr_types), total_stats, time_period
+
+# static parts of the report, kept as constants so they are built once
+_STYLES = """
     <style>
         body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
@@ -545,6 +646,71 @@ class HTMLReportGenerator:
             gap: 20px;
         }
     </style>"""
+
+_CONTRIB_CHARTS_HTML = """
+        <div class="grid-2">
+            <div class="chart-section">
+                <div class="chart-title">👥 Contributor Impact</div>
+                <div class="chart-container small">
+                    <canvas id="contributorChart"></canvas>
+                </div>
+            </div>
+            
+            <div class="chart-section">
+                <div class="chart-title">🏷️ PR Types Distribution</div>
+                <div class="chart-container small">
+                    <canvas id="prTypesChart"></canvas>
+                </div>
+            </div>
+        </div>"""
+
+class HTMLReportGenerator:
+    """Generates HTML reports from analytics data"""
+    
+    def __init__(self, analytics_data: AnalyticsData):
+        self.data = analytics_data
+    
+    def generate_report(self, title: str = "Pull Request Analytics Report") -> str:
+        """Generate complete HTML report"""
+        
+        # Format time period
+        title = html.escape(title)
+        start_date = self.data.time_period["start"].strftime("%B %d, %Y")
+        end_date = self.data.time_period["end"].strftime("%B %d, %Y")
+        period_str = f"{start_date} - {end_date}"
+        
+        report_html = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/Chart.js/3.9.1/chart.min.js"></script>
+    {self._get_styles()}
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🚀 {title}</h1>
+            <p>Development Activity Report - {period_str}</p>
+        </div>
+        
+        {self._generate_stats_cards()}
+        {self._generate_daily_chart_section()}
+        {self._generate_contributor_charts()}
+        {self._generate_contributor_table()}
+        {self._generate_insights()}
+    </div>
+    
+    {self._generate_javascript()}
+</body>
+</html>"""
+        
+        return report_html
+    
+    def _get_styles(self) -> str:
+        """Get CSS styles for the report"""
+        return _STYLES
     
     def _generate_stats_cards(self) -> str:
         """Generate statistics cards section"""
@@ -580,15 +746,15 @@ class HTMLReportGenerator:
     
     def _generate_daily_chart_section(self) -> str:
         """Generate daily changes chart section"""
-        # Find peak activity day
-        peak_day = max(self.data.daily_stats, key=lambda x: x['additions']) if self.data.daily_stats else None
-        peak_date = datetime.strptime(peak_day['date'], '%Y-%m-%d').strftime('%B %d') if peak_day else "N/A"
+        # peak activity day is found while aggregating
+        peak_day = self.data.total_stats.get('peak_day')
+        peak_date = date.fromisoformat(peak_day).strftime('%B %d') if peak_day else "N/A"
         
         insights = f"""
             <div class="insights">
                 <h3>Key Insights:</h3>
                 <ul>
-                    <li><strong>Peak Activity Day:</strong> {peak_date} with {peak_day['additions']:,} lines added</li>
+                    <li><strong>Peak Activity Day:</strong> {peak_date} with {self.data.total_stats['peak_day_additions']:,} lines added</li>
                     <li><strong>Daily Average:</strong> {self.data.total_stats['avg_additions_per_pr']:.0f} additions per PR</li>
                     <li><strong>Code Quality:</strong> {self.data.total_stats['total_deletions']:,} lines deleted shows active refactoring</li>
                 </ul>
@@ -605,47 +771,33 @@ class HTMLReportGenerator:
     
     def _generate_contributor_charts(self) -> str:
         """Generate contributor charts section"""
-        return """
-        <div class="grid-2">
-            <div class="chart-section">
-                <div class="chart-title">👥 Contributor Impact</div>
-                <div class="chart-container small">
-                    <canvas id="contributorChart"></canvas>
-                </div>
-            </div>
-            
-            <div class="chart-section">
-                <div class="chart-title">🏷️ PR Types Distribution</div>
-                <div class="chart-container small">
-                    <canvas id="prTypesChart"></canvas>
-                </div>
-            </div>
-        </div>"""
+        return _CONTRIB_CHARTS_HTML
     
     def _generate_contributor_table(self) -> str:
         """Generate contributor performance table"""
-        contributors = sorted(
-            self.data.contributor_analysis.items(),
-            key=lambda x: x[1]['additions'],
-            reverse=True
-        )
-        
-        rows = ""
-        for name, stats in contributors:
+        # sort on the pre-projected additions so the key is a C level itemgetter
+        contributors = [
+            (stats['additions'], name, stats)
+            for name, stats in self.data.contributor_analysis.items()
+        ]
+        contributors.sort(key=itemgetter(0), reverse=True)
+        
+        rows = []
+        for _, name, stats in contributors:
             net_impact = stats['net_change']
             trend_class = 'trend-up' if net_impact > 0 else 'trend-down'
             trend_text = '📈 Growing' if net_impact > 0 else '🔄 Refactoring'
             
-            rows += f"""
+            rows.append(f"""
                 <tr>
-                    <td><strong>{name}</strong></td>
+                    <td><strong>{html.escape(name)}</strong></td>
                     <td>{stats['prs']}</td>
                     <td>{stats['additions']:,}</td>
                     <td>{stats['deletions']:,}</td>
                     <td>{'+'if net_impact >= 0 else ''}{net_impact:,}</td>
                     <td>{stats['files_changed']}</td>
                     <td><span class="trend-indicator {trend_class}">{trend_text}</span></td>
-                </tr>"""
+                </tr>""")
         
         return f"""
         <div class="chart-section">
@@ -663,7 +815,7 @@ class HTMLReportGenerator:
                     </tr>
                 </thead>
                 <tbody>
-                    {rows}
+                    {"".join(rows)}
                 </tbody>
             </table>
         </div>"""
@@ -691,7 +843,7 @@ class HTMLReportGenerator:
     def _generate_javascript(self) -> str:
         """Generate JavaScript for charts"""
         # Prepare data for JavaScript
-        daily_labels = [datetime.strptime(d['date'], '%Y-%m-%d').strftime('%b %d') for d in self.data.daily_stats]
+        daily_labels = [date.fromisoformat(d['date']).strftime('%b %d') for d in self.data.daily_stats]
         daily_additions = [d['additions'] for d in self.data.daily_stats]
         daily_deletions = [d['deletions'] for d in self.data.daily_stats]
         
@@ -708,17 +860,17 @@ class HTMLReportGenerator:
         new Chart(dailyCtx, {{
             type: 'line',
             data: {{
-                labels: {daily_labels},
+                labels: {_to_js(daily_labels)},
                 datasets: [{{
                     label: 'Lines Added',
-                    data: {daily_additions},
+                    data: {_to_js(daily_additions)},
                     borderColor: '#2ecc71',
                     backgroundColor: 'rgba(46, 204, 113, 0.1)',
                     tension: 0.4,
                     fill: true
                 }}, {{
                     label: 'Lines Deleted',
-                    data: {daily_deletions},
+                    data: {_to_js(daily_deletions)},
                     borderColor: '#e74c3c',
                     backgroundColor: 'rgba(231, 76, 60, 0.1)',
                     tension: 0.4,
@@ -750,9 +902,9 @@ class HTMLReportGenerator:
         new Chart(contributorCtx, {{
             type: 'doughnut',
             data: {{
-                labels: {contributor_names},
+                labels: {_to_js(contributor_names)},
                 datasets: [{{
-                    data: {contributor_additions},
+                    data: {_to_js(contributor_additions)},
                     backgroundColor: [
                         '#3498db', '#e74c3c', '#f39c12', 
                         '#9b59b6', '#1abc9c', '#34495e',
@@ -776,9 +928,9 @@ class HTMLReportGenerator:
         new Chart(prTypesCtx, {{
             type: 'bar',
             data: {{
-                labels: {pr_type_labels},
+                labels: {_to_js(pr_type_labels)},
                 datasets: [{{
-                    data: {pr_type_values},
+                    data: {_to_js(pr_type_values)},
                     backgroundColor: ['#2ecc71', '#e74c3c', '#f39c12', '#95a5a6', '#3498db', '#9b59b6', '#34495e']
                 }}]
             }},
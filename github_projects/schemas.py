@@ -1,10 +1,24 @@
+import re
 from typing import Any
-from pydantic import BaseModel, Field
-from datetime import datetime, timedelta
-from github_projects.utils.datetime_utils import parse_datetime_flexible, ensure_timezone_aware
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime, timedelta, timezone
+from github_projects.utils.datetime_utils import parse_many
+
+
+# data from the GitHub API already matches these schemas so `from_gh_json` builds
+# models without validating them, set to False to validate input again
+_TRUST_API = True
+
+# leaf models are built in bulk and never modified, freezing them also makes
+# them safe to share e.g. between cached results
+_LEAF_CONFIG = ConfigDict(frozen=True)
 
 
 class Iteration(BaseModel):
+    model_config = _LEAF_CONFIG
+
     id: str
     title: str | None = None
     start_date: datetime | None = None
@@ -13,8 +27,17 @@ class Iteration(BaseModel):
 
     @classmethod
     def from_gh_json(cls, gh_json: dict) -> "Iteration":
-        start_date = parse_datetime_flexible(gh_json.get("startDate"))
-        end_date = parse_datetime_flexible(gh_json.get("endDate"))
+        return cls._from_gh_json(gh_json, trusted=_TRUST_API)
+
+    @classmethod
+    def _from_id(cls, iteration_id: str, trusted: bool = True) -> "Iteration":
+        """Build an iteration known only by its ID, as referenced by an item's
+        field values, there are no dates to parse so this skips `_from_gh_json`."""
+        return cls.model_construct(id=iteration_id) if trusted else cls(id=iteration_id)
+
+    @classmethod
+    def _from_gh_json(cls, gh_json: dict, trusted: bool) -> "Iteration":
+        start_date, end_date = parse_many(gh_json.get("startDate"), gh_json.get("endDate"))
         duration = gh_json.get("duration")
         
         # fill in missing values if we can
@@ -24,7 +47,8 @@ class Iteration(BaseModel):
             end_date = start_date + timedelta(days=duration)
         
         # build and return the iteration object
-        return cls(
+        build = cls.model_construct if trusted else cls
+        return build(
             id=gh_json["id"],
             title=gh_json.get("title"),
             start_date=start_date,
@@ -33,17 +57,34 @@ class Iteration(BaseModel):
         )
 
 class User(BaseModel):
+    model_config = _LEAF_CONFIG
+
     login: str
     url: str
 
 class Label(BaseModel):
+    model_config = _LEAF_CONFIG
+
     name: str
     color: str
 
 class Repo(BaseModel):
+    model_config = _LEAF_CONFIG
+
     name_with_owner: str
     url: str
 
+# GitHub repeats the same repository on every issue or PR from it, so repos are
+# built once and shared, the frozen Repo models are safe to share and the PR repo
+# dicts must not be mutated
+@lru_cache(maxsize=256)
+def _trusted_repo(name_with_owner: str, url: str) -> Repo:
+    return Repo.model_construct(name_with_owner=name_with_owner, url=url)
+
+@lru_cache(maxsize=256)
+def _pr_repo(name_with_owner: str | None, url: str | None) -> dict:
+    return {"name_with_owner": name_with_owner, "url": url}
+
 class Issue(BaseModel):
     id: str
     title: str
@@ -62,25 +103,37 @@ class Issue(BaseModel):
 
     @classmethod
     def from_gh_json(cls, gh_json: dict) -> "Issue":
+        return cls._from_gh_json(gh_json, trusted=_TRUST_API)
+
+    @classmethod
+    def _from_gh_json(cls, gh_json: dict, trusted: bool) -> "Issue":
+        # data from the GitHub API already matches the schema so trusted input
+        # can skip validation of the model and its nested models
+        build = cls.model_construct if trusted else cls
+        build_user = User.model_construct if trusted else User
+        build_label = Label.model_construct if trusted else Label
+        build_repo = _trusted_repo if trusted else Repo
+
         iteration = None
         # get iteration from fieldValues
         for fv in gh_json["fieldValues"]["nodes"]:
-            if fv.get("field", {}).get("name") == "Iteration":
-                iteration = Iteration(id=fv["iterationId"])
+            field = fv.get("field")
+            if field and field.get("name") == "Iteration" and (iteration_id := fv.get("iterationId")):
+                iteration = Iteration._from_id(iteration_id, trusted)
                 break
-        parent = cls.from_gh_json(gh_json.get("parent", {})) if gh_json.get("parent") else None
+        parent = cls._from_gh_json(gh_json.get("parent", {}), trusted) if gh_json.get("parent") else None
         content = gh_json["content"]
         
         # Parse datetimes with flexible parsing
-        createdAt = parse_datetime_flexible(content["createdAt"])
-        updatedAt = parse_datetime_flexible(content["updatedAt"])
-        closedAt = parse_datetime_flexible(content.get("closedAt"))
+        createdAt, updatedAt, closedAt = parse_many(
+            content["createdAt"], content["updatedAt"], content.get("closedAt")
+        )
         
         # Ensure required fields are present
         if not createdAt or not updatedAt:
             raise ValueError("createdAt and updatedAt are required fields")
         
-        return cls(
+        return build(
             id=content["id"],
             title=content["title"],
             url=content["url"],
@@ -89,10 +142,10 @@ class Issue(BaseModel):
             createdAt=createdAt,
             updatedAt=updatedAt,
             closedAt=closedAt,
-            author=User(**content["author"]),
-            assignees=[User(**assignee) for assignee in content["assignees"]["nodes"]],
-            labels=[Label(**label) for label in content["labels"]["nodes"]],
-            repo=Repo(
+            author=build_user(**content["author"]),
+            assignees=[build_user(**assignee) for assignee in content["assignees"]["nodes"]],
+            labels=[build_label(**label) for label in content["labels"]["nodes"]],
+            repo=build_repo(
                 name_with_owner=content["repository"]["nameWithOwner"],
                 url=content["repository"]["url"]
             ),
@@ -122,37 +175,36 @@ class PullRequest(BaseModel):
     deletions: int
     changedFiles: int
     reviews: list[dict]
-    iteration: dict | None = None
+    iteration: Iteration | None = None
 
     @classmethod
     def from_gh_json(cls, node: dict) -> "PullRequest":
+        return cls._from_gh_json(node, trusted=_TRUST_API)
+
+    @classmethod
+    def _from_gh_json(cls, node: dict, trusted: bool) -> "PullRequest":
         content = node.get("content", {})
         
         # Extract iteration info from fieldValues
         iteration = None
         field_values = node.get("fieldValues", {}).get("nodes", [])
         for field_value in field_values:
-            if field_value.get("iterationId"):
-                iteration = {
-                    "id": field_value.get("iterationId"),
-                    "title": None,  # You might want to add this
-                    "start_date": None,
-                    "end_date": None,
-                    "duration": None
-                }
+            if iteration_id := field_value.get("iterationId"):
+                iteration = Iteration._from_id(iteration_id, trusted)
                 break
         
         # Parse datetimes with flexible parsing
-        createdAt = parse_datetime_flexible(content.get("createdAt"))
-        updatedAt = parse_datetime_flexible(content.get("updatedAt"))
-        closedAt = parse_datetime_flexible(content.get("closedAt"))
-        mergedAt = parse_datetime_flexible(content.get("mergedAt"))
+        createdAt, updatedAt, closedAt, mergedAt = parse_many(
+            content.get("createdAt"), content.get("updatedAt"), content.get("closedAt"), content.get("mergedAt")
+        )
         
         # Ensure required fields are present
         if not createdAt or not updatedAt:
             raise ValueError("createdAt and updatedAt are required fields")
         
-        return cls(
+        build = cls.model_construct if trusted else cls
+        repository = content.get("repository", {})
+        return build(
             id=str(content.get("id", "")),
             number=int(content.get("number", 0)),
             title=str(content.get("title", "")),
@@ -165,35 +217,37 @@ class PullRequest(BaseModel):
             mergedAt=mergedAt,
             merged=bool(content.get("merged", False)),
             author=content.get("author"),
-            assignees=[assignee for assignee in content.get("assignees", {}).get("nodes", [])],
-            labels=[label for label in content.get("labels", {}).get("nodes", [])],
-            repo={
-                "name_with_owner": content.get("repository", {}).get("nameWithOwner"),
-                "url": content.get("repository", {}).get("url")
-            },
+            assignees=content.get("assignees", {}).get("nodes", []),
+            labels=content.get("labels", {}).get("nodes", []),
+            repo=_pr_repo(repository.get("nameWithOwner"), repository.get("url")),
             baseRefName=str(content.get("baseRefName", "")),
             headRefName=str(content.get("headRefName", "")),
             additions=int(content.get("additions", 0)),
             deletions=int(content.get("deletions", 0)),
             changedFiles=int(content.get("changedFiles", 0)),
-            reviews=[review for review in content.get("reviews", {}).get("nodes", [])],
+            reviews=content.get("reviews", {}).get("nodes", []),
             iteration=iteration
         )
 
     @classmethod
     def from_gh_json_direct(cls, node: dict) -> "PullRequest":
         """Create PullRequest from direct repository GraphQL response (not wrapped in content)"""
+        return cls._from_gh_json_direct(node, trusted=_TRUST_API)
+
+    @classmethod
+    def _from_gh_json_direct(cls, node: dict, trusted: bool) -> "PullRequest":
         # Parse datetimes with flexible parsing
-        createdAt = parse_datetime_flexible(node.get("createdAt"))
-        updatedAt = parse_datetime_flexible(node.get("updatedAt"))
-        closedAt = parse_datetime_flexible(node.get("closedAt"))
-        mergedAt = parse_datetime_flexible(node.get("mergedAt"))
+        createdAt, updatedAt, closedAt, mergedAt = parse_many(
+            node.get("createdAt"), node.get("updatedAt"), node.get("closedAt"), node.get("mergedAt")
+        )
         
         # Ensure required fields are present
         if not createdAt or not updatedAt:
             raise ValueError("createdAt and updatedAt are required fields")
         
-        return cls(
+        build = cls.model_construct if trusted else cls
+        repository = node.get("repository", {})
+        return build(
             id=str(node.get("id", "")),
             number=int(node.get("number", 0)),
             title=str(node.get("title", "")),
@@ -206,21 +260,65 @@ class PullRequest(BaseModel):
             mergedAt=mergedAt,
             merged=bool(node.get("merged", False)),
             author=node.get("author"),
-            assignees=[assignee for assignee in node.get("assignees", {}).get("nodes", [])],
-            labels=[label for label in node.get("labels", {}).get("nodes", [])],
-            repo={
-                "name_with_owner": node.get("repository", {}).get("nameWithOwner"),
-                "url": node.get("repository", {}).get("url")
-            },
+            assignees=node.get("assignees", {}).get("nodes", []),
+            labels=node.get("labels", {}).get("nodes", []),
+            repo=_pr_repo(repository.get("nameWithOwner"), repository.get("url")),
             baseRefName=str(node.get("baseRefName", "")),
             headRefName=str(node.get("headRefName", "")),
             additions=int(node.get("additions", 0)),
             deletions=int(node.get("deletions", 0)),
             changedFiles=int(node.get("changedFiles", 0)),
-            reviews=[review for review in node.get("reviews", {}).get("nodes", [])],
+            reviews=node.get("reviews", {}).get("nodes", []),
             iteration=None  # No iteration data available from direct repo queries
         )
 
+@dataclass(slots=True)
+class PullRequestStats:
+    """Lightweight pull request record holding only the fields needed to filter
+    and analyze PRs. Used internally where PRs are never returned to a client,
+    avoiding a full Pydantic model per PR.
+    """
+    id: str
+    number: int
+    title: str
+    state: str
+    createdAt: datetime
+    updatedAt: datetime
+    mergedAt: datetime | None
+    merged: bool
+    author: dict | None
+    baseRefName: str
+    additions: int
+    deletions: int
+    changedFiles: int
+
+    @classmethod
+    def from_gh_json_direct(cls, node: dict) -> "PullRequestStats":
+        """Create PullRequestStats from direct repository GraphQL response"""
+        createdAt, updatedAt, mergedAt = parse_many(
+            node.get("createdAt"), node.get("updatedAt"), node.get("mergedAt")
+        )
+        
+        # Ensure required fields are present
+        if not createdAt or not updatedAt:
+            raise ValueError("createdAt and updatedAt are required fields")
+        
+        return cls(
+            id=str(node.get("id", "")),
+            number=int(node.get("number", 0)),
+            title=str(node.get("title", "")),
+            state=str(node.get("state", "")),
+            createdAt=createdAt,
+            updatedAt=updatedAt,
+            mergedAt=mergedAt,
+            merged=bool(node.get("merged", False)),
+            author=node.get("author"),
+            baseRefName=str(node.get("baseRefName", "")),
+            additions=int(node.get("additions", 0)),
+            deletions=int(node.get("deletions", 0)),
+            changedFiles=int(node.get("changedFiles", 0)),
+        )
+
 # API schemas
 class ProjectID(BaseModel):
     """Request schema for getting basic project information."""
@@ -272,6 +370,11 @@ class RepoFilter(ProjectID):
         ]
     )
 
+    @cached_property
+    def title_re(self) -> re.Pattern | None:
+        """The compiled `title` pattern, or None when not filtering on title."""
+        return re.compile(self.title) if self.title else None
+
 class PRFilter(ProjectID):
     title: str | None = Field(
         None,
@@ -309,6 +412,11 @@ class PRFilter(ProjectID):
         description="Only return merged PRs."
     )
 
+    @cached_property
+    def title_re(self) -> re.Pattern | None:
+        """The compiled `title` pattern, or None when not filtering on title."""
+        return re.compile(self.title) if self.title else None
+
 class RepoPRFilter(BaseModel):
     owner: str = Field(
         ...,
@@ -363,6 +471,11 @@ class RepoPRFilter(BaseModel):
         description="Filter by base branch, for example 'main' or 'dev'."
     )
 
+    @cached_property
+    def title_re(self) -> re.Pattern | None:
+        """The compiled `title` pattern, or None when not filtering on title."""
+        return re.compile(self.title) if self.title else None
+
 class PRAnalyticsRequest(RepoPRFilter):
     """Request model for PR analytics report generation"""
     report_title: str = Field(
@@ -370,10 +483,10 @@ class PRAnalyticsRequest(RepoPRFilter):
         description="Title for the analytics report"
     )
     merged_after: datetime = Field(
-        default=datetime.now() - timedelta(days=30),
+        default_factory=lambda: datetime.now(timezone.utc) - timedelta(days=30),
         description="The date and time after which the PR was merged.",
     )
     merged_before: datetime = Field(
-        default=datetime.now(),
+        default_factory=lambda: datetime.now(timezone.utc),
         description="The date and time before which the PR was merged.",
     )
\ No newline at end of file
@@ -1,6 +1,18 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional 
-import re
+
+
+# formats tried by `parse_datetime_flexible` for strings that aren't fixed width
+# ISO, strptime caches the compiled pattern for each format after its first use
+_FALLBACK_FORMATS = (
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+)
 
 
 def parse_datetime_flexible(dt_str: Optional[str]) -> Optional[datetime]:
@@ -15,45 +27,49 @@ def parse_datetime_flexible(dt_str: Optional[str]) -> Optional[datetime]:
     - Date only: "2025-01-01"
     - Various other common formats
     
-    Returns timezone-aware datetime or None if parsing fails.
+    Returns timezone-aware datetime or None if parsing fails. Results are
+    cached as the same timestamps come up repeatedly across API pages.
     """
     if not dt_str:
         return None
     
     # Convert to string if needed
-    dt_str = str(dt_str).strip()
+    return _parse_datetime_cached(str(dt_str))
+
+
+@lru_cache(maxsize=4096)
+def _parse_datetime_cached(dt_str: str) -> Optional[datetime]:
+    dt_str = dt_str.strip()
     
     try:
+        # Dispatch the fixed width ISO formats on length rather than regex,
+        # fromisoformat parses the Z suffix itself as of Python 3.11
+        n = len(dt_str)
+        is_iso = n >= 10 and dt_str[4] == '-' and dt_str[7] == '-'
+        
         # Handle ISO format with Z suffix (GitHub API format)
+        if n == 20 and is_iso and dt_str[-1] == 'Z':
+            return datetime.fromisoformat(dt_str)
         if dt_str.endswith('Z'):
             dt_str = dt_str[:-1] + '+00:00'
             return datetime.fromisoformat(dt_str)
         
         # Handle ISO format with timezone offset
-        if re.match(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}$', dt_str):
+        if n == 25 and is_iso and dt_str[10] == 'T' and dt_str[19] in '+-':
             return datetime.fromisoformat(dt_str)
         
         # Handle ISO format without timezone (assume UTC)
-        if re.match(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$', dt_str):
+        if n == 19 and is_iso and dt_str[10] == 'T':
             dt = datetime.fromisoformat(dt_str)
             return dt.replace(tzinfo=timezone.utc)
         
         # Handle date-only format (assume start of day UTC)
-        if re.match(r'^\d{4}-\d{2}-\d{2}$', dt_str):
+        if n == 10 and is_iso:
             dt = datetime.strptime(dt_str, "%Y-%m-%d")
             return dt.replace(tzinfo=timezone.utc)
         
         # Try standard datetime formats
-        formats = [
-            "%Y-%m-%dT%H:%M:%SZ",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%d",
-            "%m/%d/%Y",
-            "%d/%m/%Y",
-        ]
-        
-        for fmt in formats:
+        for fmt in _FALLBACK_FORMATS:
             try:
                 dt = datetime.strptime(dt_str, fmt)
                 # Make timezone-aware if not already
@@ -70,6 +86,26 @@ def parse_datetime_flexible(dt_str: Optional[str]) -> Optional[datetime]:
         return None
 
 
+parse_datetime_flexible.cache_clear = _parse_datetime_cached.cache_clear
+
+
+def parse_many(*dt_strs: Optional[str]) -> tuple[Optional[datetime], ...]:
+    """
+    Parse several datetime strings at once, as `parse_datetime_flexible`.
+    
+    Model builders parse three or four timestamps per node, this saves a
+    wrapper call for each of them when building a full page of nodes.
+    
+    Args:
+        *dt_strs: datetime strings, any of which may be None
+        
+    Returns:
+        tuple of timezone-aware datetimes (or None) in the order given
+    """
+    parse = _parse_datetime_cached
+    return tuple([parse(str(dt_str)) if dt_str else None for dt_str in dt_strs])
+
+
 def ensure_timezone_aware(dt: Optional[datetime]) -> Optional[datetime]:
     """
     Ensure datetime is timezone-aware. If naive, assume UTC.
@@ -102,12 +138,66 @@ def normalize_datetime_for_comparison(dt: Optional[datetime]) -> Optional[dateti
     if dt is None:
         return None
     
-    dt = ensure_timezone_aware(dt)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    
+    # Convert to UTC for consistent comparison, parsed GitHub timestamps
+    # already are so skip building a copy of them
+    if dt.tzinfo is timezone.utc:
+        return dt
+    return dt.astimezone(timezone.utc)
+
+
+def to_github_timestamp(dt: Optional[datetime], round_up: bool = False) -> Optional[str]:
+    """
+    Format datetime in the fixed width UTC format used by GitHub API timestamps.
+    
+    Timestamps in this format sort lexicographically, so they can be compared
+    directly against raw API strings without parsing them. GitHub timestamps
+    are whole seconds, so a lower bound with a fractional second should be
+    rounded up for the comparison to match comparing datetimes.
+    
+    Args:
+        dt: datetime object to format (naive datetimes are assumed to be UTC)
+        round_up: round a fractional second up to the next second rather than
+            truncating it
+        
+    Returns:
+        String such as "2025-01-01T12:00:00Z", or None if dt is None
+    """
+    dt = normalize_datetime_for_comparison(dt)
     if dt is None:
         return None
     
-    # Convert to UTC for consistent comparison
-    return dt.astimezone(timezone.utc)
+    if round_up and dt.microsecond:
+        dt = dt.replace(microsecond=0) + timedelta(seconds=1)
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def to_search_range(qualifier: str, after: Optional[datetime], before: Optional[datetime]) -> Optional[str]:
+    """
+    Format a date range as a GitHub search qualifier, e.g. "updated:>=...".
+    
+    Bounds are truncated to whole seconds, so the range can be slightly wider
+    than asked for, results should still be filtered on the exact bounds.
+    
+    Args:
+        qualifier: search qualifier to range over, for example "updated"
+        after: inclusive lower bound (naive datetimes are assumed to be UTC)
+        before: inclusive upper bound (naive datetimes are assumed to be UTC)
+        
+    Returns:
+        The search qualifier, or None if both bounds are None
+    """
+    after = normalize_datetime_for_comparison(after)
+    before = normalize_datetime_for_comparison(before)
+    if after and before:
+        return f"{qualifier}:{after.isoformat(timespec='seconds')}..{before.isoformat(timespec='seconds')}"
+    if after:
+        return f"{qualifier}:>={after.isoformat(timespec='seconds')}"
+    if before:
+        return f"{qualifier}:<={before.isoformat(timespec='seconds')}"
+    return None
 
 
 def parse_date_string(date_str: Optional[str]) -> Optional[datetime]:
@@ -143,8 +233,7 @@ def format_datetime_for_display(dt: Optional[datetime]) -> str:
     if dt is None:
         return "N/A"
     
-    dt = ensure_timezone_aware(dt)
-    if dt is None:
-        return "N/A"
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
     
     return dt.strftime("%Y-%m-%d %H:%M:%S UTC") 
\ No newline at end of file